@@ -1,11 +1,335 @@
+import functools
+import hashlib
+import json
 import logging
+import math
+import os
 from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Literal, NamedTuple, overload
 
-import music21
 import numpy as np
+from scipy.special import entr
+
+try:
+    import symusic
+except ImportError:
+    symusic = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+# Pitch-class names indexed by ``pitch % 12``, spelled the way music21 names
+# MIDI pitches so transition keys match either parsing backend.
+PITCH_NAMES = ("C", "C#", "D", "E-", "E", "F", "F#", "G", "G#", "A", "B-", "B")
+
+Chord = tuple[str, ...]
+
+
+def _chord_cache_dir() -> Path | None:
+    """
+    Return the directory of the on-disk chord cache, taken from
+    ``EUTERPE_CHORD_CACHE_DIR`` or else ``$XDG_CACHE_HOME/euterpe/chords``.
+    Setting ``EUTERPE_CHORD_CACHE_DIR`` to an empty string disables the cache.
+    """
+    cache_dir = os.environ.get("EUTERPE_CHORD_CACHE_DIR")
+    if cache_dir is not None:
+        return Path(cache_dir).expanduser() if cache_dir else None
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "euterpe" / "chords"
+
+
+# Parsed chord sequences are cached here as small JSON files, one per MIDI
+# file, along with the file's modification time and size so edited files are
+# re-parsed. Bump the version whenever the cached representation changes.
+CHORD_CACHE_DIR = _chord_cache_dir()
+CHORD_CACHE_VERSION = 7
+
+# Probability assigned to transitions missing from the global transition
+# matrix, and its log2.
+UNSEEN_PROBABILITY = 1e-10
+_LOG2_UNSEEN = math.log2(UNSEEN_PROBABILITY)
+
+# MIDI channel reserved for percussion, numbered from 1 as music21 does.
+MIDI_DRUM_CHANNEL = 10
+
+# Note onsets are quantized to this many buckets per quarter note (sixteenths)
+# when grouping notes into chords.
+ONSET_RESOLUTION = 4
+
+# Number of distinct 12-bit pitch-class sets.
+PCSET_COUNT = 1 << 12
+
+
+def _pcset_names(pcset: int) -> Chord:
+    """Return the pitch-class names of a 12-bit pitch-class set."""
+    return tuple(name for pc, name in enumerate(PITCH_NAMES) if pcset >> pc & 1)
+
+
+def describe_transition(transition_key: int) -> str:
+    """
+    Describe an integer transition key as a readable string.
+
+    A chord is encoded as a 12-bit pitch-class set, with bit ``p`` set when
+    pitch class ``p`` sounds, and a transition as ``(pcset_from << 16) |
+    pcset_to``.
+
+    Args:
+        transition_key: int, a key of a transition matrix
+    Returns:
+        str, the transition as a pair of chords, e.g. "(('C', 'E'), ('D', 'G'))"
+    """
+    return str(
+        (_pcset_names(transition_key >> 16), _pcset_names(transition_key & 0xFFFF))
+    )
+
+
+def _count_transitions(chord_sequence: np.ndarray) -> dict[int, int]:
+    """
+    Count the transitions between consecutive chords of a sequence.
+
+    Args:
+        chord_sequence: uint16 array of pitch-class sets
+    Returns:
+        dict, integer transition key to the number of times it occurs
+    """
+    keys, counts = _count_bigrams(chord_sequence)
+    return dict(zip(keys.tolist(), counts.tolist(), strict=True))
+
+
+def _count_bigrams(pcsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count the bigrams of consecutive pitch-class sets.
+
+    Args:
+        pcsets: uint16 array of pitch-class sets
+    Returns:
+        tuple of arrays, the bigram keys ``(pcset_from << 16) | pcset_to`` and
+        their counts
+    """
+    codes = pcsets.astype(np.uint32)
+    bigrams = (codes[:-1] << 16) | codes[1:]
+    keys, counts = np.unique(bigrams, return_counts=True)
+    return keys, counts
+
+
+def _quantize(times: np.ndarray, ticks_per_quarter: int) -> np.ndarray:
+    """
+    Quantize time points to the nearest onset bucket, rounding halves up.
+
+    Times are given as ``times / ticks_per_quarter`` quarter notes and
+    rounded in integer arithmetic, so the result is exact.
+
+    Args:
+        times: int array, time points in ticks
+        ticks_per_quarter: int, ticks per quarter note
+    Returns:
+        int array, the bucket index of each time point
+    """
+    return (2 * ONSET_RESOLUTION * times + ticks_per_quarter) // (2 * ticks_per_quarter)
+
+
+def _group_onsets(
+    onsets: np.ndarray,
+    ends: np.ndarray,
+    pitches: np.ndarray,
+) -> np.ndarray:
+    """
+    Group notes into a chord sequence, one chord per quantized onset.
+
+    Like music21's ``chordify``, the chord at an onset holds every note
+    sounding at that point: the notes starting there and the notes still held
+    from earlier onsets. Every onset with at least two distinct pitches
+    sounding becomes a chord.
+
+    Args:
+        onsets: int array, quantized onset of each note
+        ends: int array, quantized end of each note
+        pitches: int array, MIDI pitch of each note
+    Returns:
+        uint16 array of pitch-class sets, one per chord
+    """
+    chord_onsets = np.unique(onsets)
+    if chord_onsets.size == 0:
+        return np.empty(0, dtype=np.uint16)
+
+    # Every note sounds for at least one bucket, and over the chord onsets in
+    # [onset, end)
+    ends = np.maximum(ends, onsets + 1)
+    first = np.searchsorted(chord_onsets, onsets)
+    spans = np.searchsorted(chord_onsets, ends) - first
+
+    # Expand to one (chord, pitch) pair per chord onset each note sounds over
+    note_index = np.repeat(np.arange(onsets.size), spans)
+    span_start = np.repeat(np.cumsum(spans) - spans, spans)
+    chord_index = first[note_index] + np.arange(note_index.size) - span_start
+    pairs = np.unique(chord_index * 128 + pitches[note_index])
+
+    # Pairs are sorted by chord; every chord onset holds at least its own notes
+    pair_chords = pairs >> 7
+    starts = np.flatnonzero(np.r_[True, pair_chords[1:] != pair_chords[:-1]])
+    distinct_pitches = np.diff(np.r_[starts, pairs.size])
+    pitch_classes = np.left_shift(1, (pairs & 127) % 12).astype(np.uint16)
+    pcsets: np.ndarray = np.bitwise_or.reduceat(pitch_classes, starts)
+    chords: np.ndarray = pcsets[distinct_pitches >= 2]
+    return chords
+
+
+def _chordify_symusic(midi_file: str) -> np.ndarray:
+    """
+    Extract the chord sequence of a MIDI file with symusic.
+
+    Notes from all non-drum tracks are grouped by onset, quantized to the
+    nearest of ``ONSET_RESOLUTION`` buckets per quarter note, so chords played
+    slightly ahead of or behind the beat stay together.
+
+    Args:
+        midi_file: str, path to the MIDI file
+    Returns:
+        uint16 array of pitch-class sets, one per chord
+    """
+    # symusic's stubs type the loaded score loosely, so annotate it here
+    score: Any = symusic.Score.from_file(midi_file, ttype="tick")
+    tpq = score.ticks_per_quarter
+
+    notes = [track.notes.numpy() for track in score.tracks if not track.is_drum]
+    if not notes:
+        return np.empty(0, dtype=np.uint16)
+    onsets = np.concatenate([n["time"] for n in notes]).astype(np.int64)
+    ends = onsets + np.concatenate([n["duration"] for n in notes])
+    pitches = np.concatenate([n["pitch"] for n in notes]).astype(np.int64)
+    return _group_onsets(_quantize(onsets, tpq), _quantize(ends, tpq), pitches)
+
+
+def _chordify_music21(midi_file: str) -> np.ndarray:
+    """
+    Extract the chord sequence of a MIDI file with music21.
+
+    Rather than building a score stream, which merges and splits notes as it
+    quantizes them, note-on/note-off events are read with music21's low-level
+    MIDI reader. Notes are then grouped by onset with the same quantization as
+    the symusic path, so both backends produce the same chords.
+
+    Args:
+        midi_file: str, path to the MIDI file
+    Returns:
+        uint16 array of pitch-class sets, one per chord
+    """
+    from music21 import midi
+
+    midi_data = midi.MidiFile()
+    midi_data.open(midi_file)
+    try:
+        midi_data.read()
+    finally:
+        midi_data.close()
+
+    onsets: list[int] = []
+    ends: list[int] = []
+    pitches: list[int] = []
+    for track in midi_data.tracks:
+        tick = 0
+        # Onsets of the notes sounding on each (channel, pitch)
+        sounding: dict[tuple[int, int], list[int]] = defaultdict(list)
+        for event in track.events:
+            if event.isDeltaTime():
+                tick += event.time
+            elif event.pitch is None or event.channel == MIDI_DRUM_CHANNEL:
+                continue
+            elif event.isNoteOn():
+                sounding[(event.channel, event.pitch)].append(tick)
+            elif event.isNoteOff() and sounding[(event.channel, event.pitch)]:
+                onsets.append(sounding[(event.channel, event.pitch)].pop(0))
+                ends.append(tick)
+                pitches.append(event.pitch)
+
+    tpq = midi_data.ticksPerQuarterNote
+    return _group_onsets(
+        _quantize(np.array(onsets, dtype=np.int64), tpq),
+        _quantize(np.array(ends, dtype=np.int64), tpq),
+        np.array(pitches, dtype=np.int64),
+    )
+
+
+def _chordify(midi_file: str) -> np.ndarray:
+    """
+    Extract the chord sequence of a MIDI file, using symusic when it is
+    installed and music21 otherwise.
+    """
+    if symusic is not None:
+        return _chordify_symusic(midi_file)
+    return _chordify_music21(midi_file)
+
+
+def _get_chord_sequence(midi_file: str) -> np.ndarray:
+    """
+    Return the chord sequence of a MIDI file. Sequences are memoized in
+    process and cached on disk for as long as the file is unchanged.
+
+    Args:
+        midi_file: str, path to the MIDI file
+    Returns:
+        read-only uint16 array of pitch-class sets, one per chord
+    """
+    path = os.path.abspath(midi_file)
+    stat = os.stat(path)
+    return _load_chord_sequence(path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _load_chord_sequence(path: str, mtime_ns: int, size: int) -> np.ndarray:
+    """
+    Load the chord sequence of a MIDI file from the on-disk cache, parsing the
+    file and caching the result on a miss or when the cached entry is stale.
+    The returned array is shared by every caller, so it is read-only.
+
+    Args:
+        path: str, absolute path to the MIDI file
+        mtime_ns: int, modification time of the file in nanoseconds
+        size: int, size of the file in bytes
+    Returns:
+        read-only uint16 array of pitch-class sets, one per chord
+    """
+    if CHORD_CACHE_DIR is None:
+        chord_sequence = _chordify(path)
+        chord_sequence.setflags(write=False)
+        return chord_sequence
+
+    backend = "symusic" if symusic is not None else "music21"
+    key = hashlib.blake2b(
+        f"{CHORD_CACHE_VERSION}:{backend}:{path}".encode(), digest_size=16
+    ).hexdigest()
+    cache_file = CHORD_CACHE_DIR / f"{key}.json"
+
+    try:
+        with cache_file.open() as f:
+            entry = json.load(f)
+        if entry["mtime_ns"] != mtime_ns or entry["size"] != size:
+            raise ValueError("stale cache entry")
+        # Load wide and range-check before narrowing, as older NumPy versions
+        # silently wrap out-of-range ints
+        chords = np.array(entry["chords"], dtype=np.int64)
+        if chords.ndim != 1 or (
+            chords.size and (chords.min() < 0 or chords.max() >= PCSET_COUNT)
+        ):
+            raise ValueError("corrupt cache entry")
+        chord_sequence = chords.astype(np.uint16)
+    except (OSError, ValueError, OverflowError, KeyError, TypeError):
+        chord_sequence = _chordify(path)
+        entry = {"mtime_ns": mtime_ns, "size": size, "chords": chord_sequence.tolist()}
+        try:
+            CHORD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_file.open("w") as f:
+                json.dump(entry, f)
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            logger.warning("Failed to cache chord sequence for %s: %s", path, e)
+
+    chord_sequence.setflags(write=False)
+    return chord_sequence
+
 
 def calculate_chord_entropy(midi_file: str) -> float:
     """
@@ -22,29 +346,18 @@ def calculate_chord_entropy(midi_file: str) -> float:
         float, the chord entropy of the MIDI file
 
     """
-    score = music21.converter.parse(midi_file)
-    chords = score.chordify()
-
-    logger.info(f"Chordified score: {chords}")
-
     # Extract chord progressions
-    chord_sequence: list[list[str]] = []
-    for chord in chords.flat.notes:
-        if getattr(chord, "isChord", False):
-            chord_sequence.append(chord.pitchNames)
-    logger.info(f"Chord sequence length: {len(chord_sequence)}")
+    chord_sequence = _get_chord_sequence(midi_file)
+    logger.info("Chord sequence length: %d", len(chord_sequence))
 
     # Calculate transition entropy - count the no. of times each transition occurs
-    transitions: dict[str, int] = defaultdict(int)
-    for i in range(len(chord_sequence) - 1):
-        logger.info(f"Transition: {chord_sequence[i]} -> {chord_sequence[i+1]}")
-        transitions[str((chord_sequence[i], chord_sequence[i + 1]))] += 1
-    logger.info(f"Transitions length: {len(transitions)}")
-    if transitions:
-        most_common = max(transitions, key=lambda k: transitions[k])
+    transitions = _count_transitions(chord_sequence)
+    logger.info("Transitions length: %d", len(transitions))
+    if transitions and logger.isEnabledFor(logging.INFO):
+        most_common = max(transitions, key=transitions.__getitem__)
         logger.info(
             "Most common transition: %s, with count %s",
-            most_common,
+            describe_transition(most_common),
             transitions[most_common],
         )
 
@@ -52,20 +365,135 @@ def calculate_chord_entropy(midi_file: str) -> float:
     # For each transition, calculate the probability of the transition
     # and then calculate the entropy
     total = sum(transitions.values())
-    logger.info(f"Total: {total}")
+    logger.info("Total: %d", total)
     if total == 0:
         logger.warning("No transitions found, returning entropy 0.0")
         return 0.0
-    entropy = -sum(
-        (count / total) * np.log2(count / total) for count in transitions.values()
-    )
-    logger.info(f"Entropy: {entropy}")
+    counts = np.fromiter(transitions.values(), dtype=np.int64, count=len(transitions))
+    probabilities = counts / total
+    entropy = float(entr(probabilities).sum() / np.log(2))
+    logger.info("Entropy: %s", entropy)
     return float(entropy)
 
 
+class CompiledTransitionMatrix(NamedTuple):
+    """
+    A global transition matrix compiled for fast lookups.
+
+    Transitions with zero probability have a log2 probability of 0, so they
+    do not contribute to the entropy.
+    """
+
+    keys: np.ndarray  # sorted uint32 transition keys
+    log2_probabilities: np.ndarray  # float32 log2 probability of each key
+
+
+def _check_transition_keys(global_transition_matrix: dict[int, float]) -> None:
+    """
+    Check that a global transition matrix is keyed by integer transition keys,
+    as returned by ``build_global_transition_matrix``. Matrices keyed by chord
+    tuples or strings (e.g. after a JSON round trip) would otherwise silently
+    treat every transition as unseen.
+
+    Raises:
+        TypeError: if the matrix keys are not integers
+    """
+    key = next(iter(global_transition_matrix), 0)
+    if isinstance(key, bool) or not isinstance(key, (int, np.integer)):
+        raise TypeError(
+            "Global transition matrix keys must be integer transition keys, "
+            f"got {type(key).__name__}; convert them with int() if the matrix "
+            "was loaded from JSON"
+        )
+
+
+def compile_global_matrix(
+    global_transition_matrix: dict[int, float],
+) -> CompiledTransitionMatrix:
+    """
+    Compile a global transition matrix into sorted key and log2 probability
+    arrays, so it can be reused across entropy calculations without hashing
+    or taking logarithms per transition.
+
+    Args:
+        global_transition_matrix: dict, as returned by
+            ``build_global_transition_matrix``
+    Returns:
+        CompiledTransitionMatrix, the compiled matrix
+
+    Raises:
+        TypeError: if the matrix keys are not integers
+    """
+    _check_transition_keys(global_transition_matrix)
+    n = len(global_transition_matrix)
+    keys = np.fromiter(global_transition_matrix.keys(), dtype=np.uint32, count=n)
+    probabilities = np.fromiter(
+        global_transition_matrix.values(), dtype=np.float64, count=n
+    )
+    order = np.argsort(keys)
+    keys, probabilities = keys[order], probabilities[order]
+
+    log2_probabilities = np.zeros(n, dtype=np.float32)
+    positive = probabilities > 0  # Avoid log(0)
+    log2_probabilities[positive] = np.log2(probabilities[positive])
+    return CompiledTransitionMatrix(keys, log2_probabilities)
+
+
+def _lookup_log2_probabilities(
+    compiled: CompiledTransitionMatrix, keys: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Look up the log2 global probabilities of some transition keys in a compiled
+    matrix. Unseen transitions are assigned a very low probability.
+
+    Returns:
+        tuple of arrays, the log2 probabilities and a mask of unseen keys
+    """
+    if compiled.keys.size == 0:
+        unseen = np.ones(keys.size, dtype=bool)
+        return np.full(keys.size, _LOG2_UNSEEN), unseen
+
+    index = np.minimum(np.searchsorted(compiled.keys, keys), compiled.keys.size - 1)
+    unseen = compiled.keys[index] != keys
+    log2_probabilities = np.where(
+        unseen, _LOG2_UNSEEN, compiled.log2_probabilities[index]
+    )
+    return log2_probabilities, unseen
+
+
+def _gather_log2_probabilities(
+    global_transition_matrix: dict[int, float], transitions: dict[int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the log2 global probabilities of a file's transitions from a
+    transition matrix dict. Unseen transitions are assigned a very low
+    probability and zero-probability transitions a log2 probability of 0.
+
+    Returns:
+        tuple of arrays, the log2 probabilities and a mask of unseen keys
+
+    Raises:
+        TypeError: if the matrix keys are not integers
+    """
+    _check_transition_keys(global_transition_matrix)
+    n = len(transitions)
+    global_probabilities = np.fromiter(
+        (global_transition_matrix.get(key, np.nan) for key in transitions),
+        dtype=np.float64,
+        count=n,
+    )
+    unseen = np.isnan(global_probabilities)
+
+    log2_probabilities = np.zeros(n, dtype=np.float64)
+    positive = global_probabilities > 0  # Avoid log(0)
+    log2_probabilities[positive] = np.log2(global_probabilities[positive])
+    log2_probabilities[unseen] = _LOG2_UNSEEN
+    return log2_probabilities, unseen
+
+
 def calculate_chord_entropy_from_global_transition_matrix(
     midi_file: str,
-    global_transition_matrix: dict[str, float],
+    global_transition_matrix: dict[int, float] | CompiledTransitionMatrix,
     normalized: bool = False,
 ) -> float:
     """
@@ -79,8 +507,10 @@ def calculate_chord_entropy_from_global_transition_matrix(
     Args:
         midi_file: str, path to the MIDI file
         global_transition_matrix: dict, pre-calculated transition matrix where:
-            - keys are transition strings like "('C', 'G')"
+            - keys are integer transition keys, see ``describe_transition``
             - values are probabilities (should sum to 1.0)
+            or the same matrix compiled with ``compile_global_matrix``, which
+            is faster when scoring many files against one matrix
         normalized: bool, if True returns normalized entropy (0-1),
             if False returns raw entropy
 
@@ -89,117 +519,164 @@ def calculate_chord_entropy_from_global_transition_matrix(
         probabilities
         - If normalized=True: score between 0 and 1 (0=predictable, 1=unpredictable)
         - If normalized=False: raw entropy value
-    """
-    score = music21.converter.parse(midi_file)
-    chords = score.chordify()
 
+    Raises:
+        TypeError: if the global transition matrix keys are not integers
+    """
     # Extract chord sequence
-    chord_sequence: list[list[str]] = [
-        chord.pitchNames
-        for chord in chords.flat.notes
-        if getattr(chord, "isChord", False)
-    ]
-    logger.info(f"Chord sequence length: {len(chord_sequence)}")
+    chord_sequence = _get_chord_sequence(midi_file)
+    logger.info("Chord sequence length: %d", len(chord_sequence))
 
     if len(chord_sequence) < 2:
         logger.warning("Chord sequence too short for entropy calculation")
         return 0.0
 
     # Calculate transitions in the new file
-    transitions: dict[str, int] = defaultdict(int)
-    for i in range(len(chord_sequence) - 1):
-        transition_key = str((chord_sequence[i], chord_sequence[i + 1]))
-        transitions[transition_key] += 1
+    transitions = _count_transitions(chord_sequence)
 
-    logger.info(f"Unique transitions in file: {len(transitions)}")
+    logger.info("Unique transitions in file: %d", len(transitions))
 
     # Calculate entropy using global transition probabilities
     total_transitions = sum(transitions.values())
     if total_transitions == 0:
         logger.warning("No transitions found, returning entropy 0.0")
         return 0.0
-    entropy = 0.0
-
-    for transition_key, count in transitions.items():
-        if transition_key in global_transition_matrix:
-            # Use global probability for this transition
-            global_probability = global_transition_matrix[transition_key]
-            if global_probability > 0:  # Avoid log(0)
-                # Weight by how often this transition occurs in the new file
-                local_probability = count / total_transitions
-                entropy -= local_probability * np.log2(global_probability)
-        else:
-            # Handle unseen transitions - assign very low probability
-            logger.debug(f"Unseen transition: {transition_key}")
-            local_probability = count / total_transitions
-            # Use a very small probability for unseen transitions
-            unseen_probability = 1e-10
-            entropy -= local_probability * np.log2(unseen_probability)
+
+    # Look up the log2 global probability of each transition in the file
+    n = len(transitions)
+    counts = np.fromiter(transitions.values(), dtype=np.float64, count=n)
+    if isinstance(global_transition_matrix, CompiledTransitionMatrix):
+        keys = np.fromiter(transitions, dtype=np.uint32, count=n)
+        global_log2_probabilities, unseen = _lookup_log2_probabilities(
+            global_transition_matrix, keys
+        )
+    else:
+        global_log2_probabilities, unseen = _gather_log2_probabilities(
+            global_transition_matrix, transitions
+        )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Unseen transitions: %d", np.count_nonzero(unseen))
+
+    # Weight each transition by how often it occurs in the new file
+    local_probabilities = counts * (1.0 / total_transitions)
+    entropy = float(-(local_probabilities * global_log2_probabilities).sum())
 
     # Normalize if requested
     if normalized:
         # Calculate maximum possible entropy for this file
-        unique_transitions = set(transitions.keys())
-        max_entropy = (
-            np.log2(len(unique_transitions)) if len(unique_transitions) > 0 else 0
-        )
+        max_entropy = float(np.log2(n)) if n > 0 else 0.0
 
         # Normalize to 0-1 scale
         normalized_entropy = entropy / max_entropy if max_entropy > 0 else 0
-        logger.info(f"Normalized entropy: {normalized_entropy}")
+        logger.info("Normalized entropy: %s", normalized_entropy)
         return float(normalized_entropy)
     else:
-        logger.info(f"Entropy (using global matrix): {entropy}")
+        logger.info("Entropy (using global matrix): %s", entropy)
         return float(entropy)
 
 
-def build_global_transition_matrix(midi_files: list[str]) -> dict[str, float]:
+def _count_file_transitions(midi_file: str) -> dict[int, int]:
+    """
+    Count the chord transitions in a single MIDI file.
+
+    Runs in a worker process, so failures are logged and reported as an empty
+    count rather than raised.
+
+    Args:
+        midi_file: str, path to the MIDI file
+    Returns:
+        dict, integer transition key to the number of times it occurs
+    """
+    try:
+        chord_sequence = _get_chord_sequence(midi_file)
+        return _count_transitions(chord_sequence)
+    except Exception as e:
+        logger.warning("Failed to process %s: %s", midi_file, e)
+        return {}
+
+
+def _iter_file_transitions(
+    midi_files: list[str], max_workers: int | None = None
+) -> Iterator[dict[int, int]]:
+    """
+    Yield the transition counts of each MIDI file, fanning the files out over a
+    process pool when there is more than one file to process.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(midi_files))
+    if workers <= 1:
+        yield from map(_count_file_transitions, midi_files)
+        return
+
+    chunksize = max(1, len(midi_files) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            _count_file_transitions, midi_files, chunksize=chunksize
+        )
+
+
+@overload
+def build_global_transition_matrix(
+    midi_files: list[str],
+    max_workers: int | None = None,
+    *,
+    compiled: Literal[False] = False,
+) -> dict[int, float]: ...
+
+
+@overload
+def build_global_transition_matrix(
+    midi_files: list[str],
+    max_workers: int | None = None,
+    *,
+    compiled: Literal[True],
+) -> CompiledTransitionMatrix: ...
+
+
+def build_global_transition_matrix(
+    midi_files: list[str],
+    max_workers: int | None = None,
+    *,
+    compiled: bool = False,
+) -> dict[int, float] | CompiledTransitionMatrix:
     """
     Build a global transition matrix from a dataset of MIDI files.
 
     This function analyzes multiple MIDI files to create a probability distribution
     of chord transitions that can be used for entropy calculations on new files.
+    Files are processed in parallel worker processes.
 
     Args:
         midi_files: list of str, paths to MIDI files in the dataset
+        max_workers: int, number of worker processes, defaults to the CPU count
+        compiled: bool, if True returns the matrix compiled with its log2
+            probabilities precomputed, see ``compile_global_matrix``
 
     Returns:
         dict, global transition matrix where:
-            - keys are transition strings like "('C', 'G')"
+            - keys are integer transition keys, see ``describe_transition``
             - values are probabilities (sum to 1.0)
+        or a CompiledTransitionMatrix if compiled=True
     """
-    global_transitions: dict[str, int] = defaultdict(int)
+    global_transitions: dict[int, int] = defaultdict(int)
     total_transitions: int = 0
 
     logger.info("Building global transition matrix from %d files", len(midi_files))
 
-    for midi_file in midi_files:
-        try:
-            score = music21.converter.parse(midi_file)
-            chords = score.chordify()
-            chord_sequence: list[list[str]] = [
-                chord.pitchNames
-                for chord in chords.flat.notes
-                if getattr(chord, "isChord", False)
-            ]
-
-            # Count transitions in this file
-            for i in range(len(chord_sequence) - 1):
-                transition_key = str((chord_sequence[i], chord_sequence[i + 1]))
-                global_transitions[transition_key] += 1
-                total_transitions += 1
-
-        except Exception as e:
-            logger.warning("Failed to process %s: %s", midi_file, e)
-            continue
+    for local in _iter_file_transitions(midi_files, max_workers):
+        for transition, count in local.items():
+            global_transitions[transition] += count
+            total_transitions += count
 
     # Convert counts to probabilities
-    global_transition_matrix: dict[str, float] = {}
+    global_transition_matrix: dict[int, float] = {}
     if total_transitions == 0:
         logger.warning("No transitions found in dataset, returning empty matrix")
+        if compiled:
+            return compile_global_matrix(global_transition_matrix)
         return global_transition_matrix
+    inv_total = 1.0 / total_transitions
     for transition, count in global_transitions.items():
-        global_transition_matrix[transition] = count / total_transitions
+        global_transition_matrix[transition] = count * inv_total
 
     logger.info(
         "Global transition matrix built with %d unique transitions",
@@ -207,6 +684,8 @@ def build_global_transition_matrix(midi_files: list[str]) -> dict[str, float]:
     )
     logger.info("Total transitions analyzed: %d", total_transitions)
 
+    if compiled:
+        return compile_global_matrix(global_transition_matrix)
     return global_transition_matrix
 
 
@@ -215,7 +694,9 @@ if __name__ == "__main__":
     logger.info("Calculating chord entropy...")
     # calculate_chord_entropy("pop909_021/021.mid")
 
-    global_transition_matrix = build_global_transition_matrix(["pop909_021/021.mid"])
+    global_transition_matrix = build_global_transition_matrix(
+        ["pop909_021/021.mid"], compiled=True
+    )
     calculate_chord_entropy_from_global_transition_matrix(
         "pop909_021/021.mid", global_transition_matrix
     )
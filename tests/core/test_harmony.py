@@ -0,0 +1,215 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core import harmony
+
+
+def _write_midi(
+    path: Path, notes: list[tuple[int, int, int]], ticks_per_quarter: int = 480
+) -> str:
+    """Write (time, duration, pitch) notes to a single-track MIDI file."""
+    symusic = pytest.importorskip("symusic")
+    score = symusic.Score(ticks_per_quarter)
+    track = symusic.Track()
+    for time, duration, pitch in notes:
+        track.notes.append(symusic.Note(time, duration, pitch, 80))
+    score.tracks.append(track)
+    score.dump_midi(str(path))
+    return str(path)
+
+
+def test_backends_produce_the_same_chords(tmp_path: Path) -> None:
+    pytest.importorskip("music21")
+    rng = np.random.default_rng(0)
+    notes: list[tuple[int, int, int]] = []
+    time = 0
+    for _ in range(40):
+        time += int(rng.choice([240, 480, 720]))
+        # Humanized and near-bucket-boundary onsets
+        pitches = rng.choice(range(55, 75), size=3, replace=False)
+        shifts = rng.choice([-61, -60, -59, -3, 0, 2, 59, 60, 61], size=3)
+        for pitch, shift in zip(pitches, shifts, strict=True):
+            duration = int(rng.choice([200, 480, 960]))
+            notes.append((time + int(shift), duration, int(pitch)))
+    midi_file = _write_midi(tmp_path / "piece.mid", notes)
+
+    from_symusic = harmony._chordify_symusic(midi_file)
+    from_music21 = harmony._chordify_music21(midi_file)
+
+    assert from_symusic.size > 0
+    np.testing.assert_array_equal(from_symusic, from_music21)
+
+
+@pytest.mark.parametrize("key", ["4097", ("C", "E"), True])
+def test_non_integer_matrix_keys_are_rejected(key: object) -> None:
+    matrix = {key: 1.0}
+    transitions = {(1 << 16) | 1: 3}
+
+    with pytest.raises(TypeError):
+        harmony._gather_log2_probabilities(matrix, transitions)  # type: ignore[arg-type]
+    with pytest.raises(TypeError):
+        harmony.compile_global_matrix(matrix)  # type: ignore[arg-type]
+
+
+def test_chord_cache_replaces_entries_of_edited_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(harmony, "CHORD_CACHE_DIR", cache_dir)
+    midi_file = _write_midi(tmp_path / "piece.mid", [(0, 480, 60), (0, 480, 64)])
+    np.testing.assert_array_equal(harmony._get_chord_sequence(midi_file), [0b10001])
+
+    _write_midi(tmp_path / "piece.mid", [(0, 480, 62), (0, 480, 67)])
+    os.utime(midi_file, ns=(0, 1))
+    np.testing.assert_array_equal(harmony._get_chord_sequence(midi_file), [0b10000100])
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+@pytest.mark.parametrize("chords", [[1 << 20], [1 << 64], [4096], [-1], [[17]]])
+def test_corrupt_chord_cache_entries_are_reparsed(
+    chords: list[object], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(harmony, "CHORD_CACHE_DIR", cache_dir)
+    midi_file = _write_midi(tmp_path / "piece.mid", [(0, 480, 60), (0, 480, 64)])
+    harmony._get_chord_sequence(midi_file)
+    harmony._load_chord_sequence.cache_clear()
+
+    (cache_file,) = cache_dir.iterdir()
+    entry = json.loads(cache_file.read_text())
+    entry["chords"] = chords
+    cache_file.write_text(json.dumps(entry))
+
+    np.testing.assert_array_equal(harmony._get_chord_sequence(midi_file), [0b10001])
+
+
+def test_chord_cache_can_be_disabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("EUTERPE_CHORD_CACHE_DIR", "")
+    assert harmony._chord_cache_dir() is None
+
+    monkeypatch.delenv("EUTERPE_CHORD_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert harmony._chord_cache_dir() == tmp_path / "euterpe" / "chords"
+
+
+def _group(notes: list[tuple[int, int, int]]) -> list[int]:
+    """Group (onset, end, pitch) notes and return the chords as ints."""
+    onsets, ends, pitches = np.array(notes, dtype=np.int64).reshape(-1, 3).T
+    chords: list[int] = harmony._group_onsets(onsets, ends, pitches).tolist()
+    return chords
+
+
+def test_group_onsets_includes_held_notes() -> None:
+    # C held across the E onset, then G alone after C ends
+    notes = [(0, 8, 60), (4, 6, 64), (8, 10, 67), (8, 10, 72)]
+    assert _group(notes) == [0b10001, 0b10000001]
+
+
+def test_group_onsets_counts_distinct_pitches() -> None:
+    # An octave doubling is a chord of one pitch class, a unison is no chord
+    assert _group([(0, 1, 60), (0, 1, 72)]) == [0b1]
+    assert _group([(0, 1, 60), (0, 1, 60)]) == []
+
+
+def test_group_onsets_gives_zero_length_notes_one_onset() -> None:
+    assert _group([(0, 0, 60), (0, 0, 64), (1, 1, 67)]) == [0b10001]
+
+
+def test_group_onsets_handles_empty_input() -> None:
+    chords = harmony._group_onsets(*(np.empty(0, dtype=np.int64),) * 3)
+    assert chords.dtype == np.uint16
+    assert chords.size == 0
+
+
+@pytest.mark.parametrize("distinct", [1, 12, 600])
+def test_count_transitions_matches_a_python_count(distinct: int) -> None:
+    rng = np.random.default_rng(distinct)
+    alphabet = rng.choice(harmony.PCSET_COUNT, size=distinct, replace=False)
+    pcsets = rng.choice(alphabet, size=5000).astype(np.uint16)
+    expected: dict[int, int] = {}
+    for a, b in zip(pcsets[:-1].tolist(), pcsets[1:].tolist(), strict=True):
+        expected[a << 16 | b] = expected.get(a << 16 | b, 0) + 1
+
+    assert harmony._count_transitions(pcsets) == expected
+
+
+def test_compiled_and_dict_lookups_agree() -> None:
+    matrix = {1 << 16 | 2: 0.5, 2 << 16 | 3: 0.0, 3 << 16 | 1: 0.25, 5: 0.25}
+    # Seen, zero-probability, unseen below, between and above the stored keys
+    transitions = {1 << 16 | 2: 2, 2 << 16 | 3: 1, 1: 1, 3 << 16: 1, 4 << 16: 3}
+    keys = np.fromiter(transitions, dtype=np.uint32)
+    unseen_log2 = harmony._LOG2_UNSEEN
+
+    for matrix_, expected in [
+        (matrix, [-1.0, 0.0, unseen_log2, unseen_log2, unseen_log2]),
+        ({}, [unseen_log2] * 5),
+    ]:
+        gathered, gathered_unseen = harmony._gather_log2_probabilities(
+            matrix_, transitions
+        )
+        looked_up, unseen = harmony._lookup_log2_probabilities(
+            harmony.compile_global_matrix(matrix_), keys
+        )
+        np.testing.assert_array_equal(gathered, expected)
+        np.testing.assert_allclose(looked_up, expected, rtol=1e-6)
+        np.testing.assert_array_equal(unseen, gathered_unseen)
+        np.testing.assert_array_equal(unseen, np.array(expected) == unseen_log2)
+
+
+def test_entropy_is_the_same_for_compiled_and_dict_matrices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(harmony, "CHORD_CACHE_DIR", None)
+    c_e, d_g, f_a = 0b10001, 0b10000100, 0b1000100000
+    chords = [(60, 64), (62, 67), (60, 64), (65, 69), (62, 67), (60, 64)]
+    notes = [(480 * i, 480, pitch) for i, chord in enumerate(chords) for pitch in chord]
+    midi_file = _write_midi(tmp_path / "piece.mid", notes)
+    # F-A -> D-G is unseen and C-E -> F-A has zero probability
+    matrix = {c_e << 16 | d_g: 0.5, c_e << 16 | f_a: 0.0, d_g << 16 | c_e: 0.5}
+    compiled = harmony.compile_global_matrix(matrix)
+
+    for normalized in (False, True):
+        from_dict = harmony.calculate_chord_entropy_from_global_transition_matrix(
+            midi_file, matrix, normalized
+        )
+        from_compiled = harmony.calculate_chord_entropy_from_global_transition_matrix(
+            midi_file, compiled, normalized
+        )
+        assert from_dict > 0
+        assert from_compiled == pytest.approx(from_dict, rel=1e-6)
+
+
+def test_global_matrix_is_the_same_with_and_without_a_pool(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("EUTERPE_CHORD_CACHE_DIR", "")
+    monkeypatch.setattr(harmony, "CHORD_CACHE_DIR", None)
+    progressions = [
+        [(60, 64), (62, 67), (60, 64)],
+        [(65, 69), (60, 64), (62, 67), (65, 69)],
+        [(60, 67), (60, 64)],
+    ]
+    midi_files = [
+        _write_midi(
+            tmp_path / f"piece{i}.mid",
+            [(480 * j, 480, p) for j, chord in enumerate(chords) for p in chord],
+        )
+        for i, chords in enumerate(progressions)
+    ]
+    broken = tmp_path / "broken.mid"
+    broken.write_bytes(b"not a MIDI file")
+    midi_files.insert(1, str(broken))
+
+    serial = harmony.build_global_transition_matrix(midi_files, max_workers=1)
+    pooled = harmony.build_global_transition_matrix(midi_files, max_workers=2)
+
+    # Six transitions, C-E -> D-G twice; the broken file is skipped
+    assert len(serial) == 5
+    assert serial[0b10001 << 16 | 0b10000100] == pytest.approx(2 / 6)
+    assert pooled == serial